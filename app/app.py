@@ -1,10 +1,15 @@
 import reflex as rx
-from app.states.inventory_state import InventoryState
+from app.states.inventory_state import (
+    InventoryState,
+    warm_supabase_client,
+    warm_upload_pool,
+)
 from app.components.inventory_ui import (
     filter_bar,
     inventory_table,
     items_grid,
     stats_summary,
+    store_summary_table,
     empty_state,
 )
 
@@ -17,21 +22,38 @@ def upload_section() -> rx.Component:
             class_name="text-lg font-semibold text-gray-900 mb-4",
         ),
         rx.el.div(
+            rx.el.div(
+                rx.el.label(
+                    "Tienda",
+                    class_name="block text-sm font-medium text-gray-700 mb-1",
+                ),
+                rx.el.input(
+                    placeholder="Ej. Sucursal Centro",
+                    on_change=InventoryState.set_upload_store,
+                    class_name="w-full px-3 py-2 bg-white border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500",
+                    default_value=InventoryState.upload_store,
+                ),
+                rx.el.p(
+                    "Se aplica a las hojas sin columna tienda. Con varios archivos y este campo vacío, se usa el nombre de cada archivo como tienda.",
+                    class_name="text-xs text-gray-400 mt-1",
+                ),
+                class_name="mb-4",
+            ),
             rx.upload.root(
                 rx.el.div(
                     rx.icon("upload", class_name="h-10 w-10 text-blue-500 mb-3"),
                     rx.el.p(
-                        "Arrastra tu archivo Excel aquí o haz clic para seleccionar",
+                        "Arrastra tus archivos Excel aquí o haz clic para seleccionar",
                         class_name="text-sm text-gray-600 font-medium",
                     ),
                     rx.el.p(
-                        "Soporta .xlsx (Columnas requeridas: sku, descripcion, familia, existencia)",
+                        "Soporta .xlsx con varias hojas (Columnas requeridas: sku, descripcion, familia, existencia; opcional: tienda)",
                         class_name="text-xs text-gray-400 mt-1",
                     ),
                     class_name="flex flex-col items-center justify-center p-10 border-2 border-dashed border-blue-200 rounded-xl bg-blue-50 hover:bg-blue-100 transition-colors cursor-pointer",
                 ),
                 id="upload_excel",
-                multiple=False,
+                multiple=True,
                 accept={
                     "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": [
                         ".xlsx"
@@ -221,6 +243,7 @@ def index() -> rx.Component:
                 ),
                 filter_bar(),
                 stats_summary(),
+                store_summary_table(),
                 rx.cond(
                     InventoryState.is_loading,
                     rx.el.div(
@@ -258,5 +281,7 @@ app = rx.App(
         ),
     ],
 )
+app.register_lifespan_task(warm_supabase_client)
+app.register_lifespan_task(warm_upload_pool)
 app.add_page(index, route="/", on_load=InventoryState.load_data)
 app.add_page(config_page, route="/config")
\ No newline at end of file
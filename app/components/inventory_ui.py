@@ -1,5 +1,5 @@
 import reflex as rx
-from app.states.inventory_state import InventoryState, InventoryItem
+from app.states.inventory_state import InventoryState, InventoryItem, StoreSummary
 
 
 def status_badge(stock: int) -> rx.Component:
@@ -71,6 +71,18 @@ def filter_bar() -> rx.Component:
             ),
             class_name="w-full md:w-64",
         ),
+        rx.el.div(
+            rx.el.label(
+                "Tienda", class_name="block text-sm font-medium text-gray-700 mb-1"
+            ),
+            rx.el.select(
+                rx.foreach(InventoryState.stores, lambda t: rx.el.option(t, value=t)),
+                value=InventoryState.selected_store,
+                on_change=InventoryState.set_store,
+                class_name="w-full px-3 py-2 bg-white border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors",
+            ),
+            class_name="w-full md:w-48",
+        ),
         class_name="flex flex-col md:flex-row gap-4 p-4 bg-white rounded-xl shadow-sm border border-gray-100 mb-6",
     )
 
@@ -210,6 +222,60 @@ def stats_summary() -> rx.Component:
     )
 
 
+def store_summary_row(summary: StoreSummary) -> rx.Component:
+    """Row of the cross-store summary table."""
+    return rx.el.tr(
+        rx.el.td(
+            rx.el.span(summary.tienda, class_name="font-medium text-gray-900"),
+            class_name="px-6 py-3 whitespace-nowrap text-sm",
+        ),
+        rx.el.td(
+            summary.total_items,
+            class_name="px-6 py-3 whitespace-nowrap text-sm text-right text-gray-900",
+        ),
+        rx.el.td(
+            rx.el.span(summary.total_existencia, class_name="font-semibold"),
+            class_name="px-6 py-3 whitespace-nowrap text-sm text-right text-gray-900",
+        ),
+        class_name="border-b border-gray-100 last:border-0",
+    )
+
+
+def store_summary_table() -> rx.Component:
+    """Cross-store totals, shown when all stores are selected."""
+    return rx.cond(
+        (InventoryState.selected_store == "Todas")
+        & (InventoryState.store_summaries.length() > 1),
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.el.th(
+                            "Tienda",
+                            class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                        ),
+                        rx.el.th(
+                            "Items",
+                            class_name="px-6 py-3 text-right text-xs font-medium text-gray-500 uppercase tracking-wider",
+                        ),
+                        rx.el.th(
+                            "Existencias",
+                            class_name="px-6 py-3 text-right text-xs font-medium text-gray-500 uppercase tracking-wider",
+                        ),
+                    ),
+                    class_name="bg-gray-50 border-b border-gray-200",
+                ),
+                rx.el.tbody(
+                    rx.foreach(InventoryState.store_summaries, store_summary_row),
+                    class_name="bg-white",
+                ),
+                class_name="min-w-full",
+            ),
+            class_name="bg-white rounded-xl shadow-sm border border-gray-200 overflow-x-auto mb-6",
+        ),
+    )
+
+
 def empty_state() -> rx.Component:
     """Shown when no items are found."""
     return rx.el.div(
@@ -219,7 +285,12 @@ def empty_state() -> rx.Component:
             class_name="text-lg font-medium text-gray-900",
         ),
         rx.el.p(
-            "Intenta ajustar los filtros o seleccionar otra fecha.",
+            rx.cond(
+                (InventoryState.selected_store == "Todas")
+                & (InventoryState.store_summaries.length() > 0),
+                "Selecciona una tienda para ver sus productos.",
+                "Intenta ajustar los filtros o seleccionar otra fecha.",
+            ),
             class_name="text-gray-500 text-center max-w-xs",
         ),
         class_name="flex flex-col items-center justify-center py-12 px-4 bg-white rounded-xl border border-gray-200 border-dashed",
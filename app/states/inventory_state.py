@@ -1,21 +1,200 @@
 import os
+import asyncio
 import datetime
 import logging
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
 import reflex as rx
-from supabase import create_client, Client
-from typing import Optional
-import pandas as pd
-import io
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, TYPE_CHECKING
+from app.states.upload_parser import parse_workbook, warm_worker
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_KEY")
-supabase_client: Optional[Client] = None
-if supabase_url and supabase_key:
+_supabase_client: Optional["Client"] = None
+_client_lock = threading.Lock()
+_cold_start: dict[str, float] = {}
+
+cold_start_logger = logging.getLogger("app.cold_start")
+cold_start_logger.setLevel(logging.INFO)
+if not cold_start_logger.handlers:
+    cold_start_logger.addHandler(logging.StreamHandler())
+    cold_start_logger.propagate = False
+
+
+def get_supabase_client() -> Optional["Client"]:
+    """Return the shared Supabase client, importing supabase on first use."""
+    global _supabase_client
+    if not (supabase_url and supabase_key):
+        return None
+    with _client_lock:
+        if _supabase_client is None:
+            start = time.perf_counter()
+            try:
+                from supabase import create_client
+
+                _supabase_client = create_client(supabase_url, supabase_key)
+            except Exception as e:
+                logging.exception(f"Error initializing Supabase: {e}")
+                print(f"Error initializing Supabase: {e}")
+                return None
+            _cold_start.setdefault("client_ms", (time.perf_counter() - start) * 1000)
+        return _supabase_client
+
+
+async def warm_supabase_client():
+    """Create the shared client in the background once the server starts."""
+    await get_supabase_client_async()
+
+
+async def get_supabase_client_async() -> Optional["Client"]:
+    """Return the shared client without blocking the event loop.
+
+    Creation, and waiting on a creation already in progress, happen in a
+    worker thread.
+    """
+    if _supabase_client is not None:
+        return _supabase_client
+    return await asyncio.to_thread(get_supabase_client)
+
+
+PARTITION_CACHE_SIZE = 32
+_partition_cache: OrderedDict[tuple[str, str], tuple[str, list[dict]]] = OrderedDict()
+
+
+def _fetch_partition(
+    client: "Client", tienda: str, fecha: str, version: str
+) -> list[dict]:
+    """Return the inventory rows of one store on a date, using the cache.
+
+    `version` is the `actualizado` stamp of the partition's summary row; a
+    cached partition with a different stamp is fetched again. The cache keeps
+    the PARTITION_CACHE_SIZE most recently used partitions.
+    """
+    key = (tienda, fecha)
+    cached = _partition_cache.get(key)
+    if version and cached and cached[0] == version:
+        _partition_cache.move_to_end(key)
+        return cached[1]
+    response = (
+        client.table("inventarios")
+        .select("*")
+        .eq("fecha", fecha)
+        .eq("tienda", tienda)
+        .execute()
+    )
+    _partition_cache[key] = (version, response.data)
+    _partition_cache.move_to_end(key)
+    while len(_partition_cache) > PARTITION_CACHE_SIZE:
+        _partition_cache.popitem(last=False)
+    return response.data
+
+
+def _replace_partitions(client: "Client", fecha: str, records: list[dict]) -> None:
+    """Overwrite every (tienda, fecha) partition present in `records`.
+
+    The delete, insert and summary upsert run in a single transaction inside
+    the `reemplazar_inventario` database function, which takes a transaction
+    advisory lock per partition so uploads from any backend worker serialize.
+    """
+    client.rpc(
+        "reemplazar_inventario", {"p_fecha": fecha, "p_registros": records}
+    ).execute()
+    for tienda in {r["tienda"] for r in records}:
+        _partition_cache.pop((tienda, fecha), None)
+
+
+def _report_cold_start(request_ms: float) -> None:
+    """Log this worker's client creation and first-request timings once."""
+    if "first_request_ms" in _cold_start:
+        return
+    _cold_start["first_request_ms"] = request_ms
+    cold_start_logger.info(
+        "Cold start: client creation %.1f ms, first load_data %.1f ms",
+        _cold_start.get("client_ms", 0.0),
+        request_ms,
+    )
+
+
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+_upload_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_upload_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool used to parse uploaded workbooks.
+
+    Workers are spawned rather than forked from the multi-threaded server.
+    Spawn re-runs the server's main module in each worker, which loads reflex,
+    so `warm_upload_pool` starts them when the server starts.
+    """
+    global _upload_pool
+    if _upload_pool is None:
+        _upload_pool = ProcessPoolExecutor(
+            max_workers=UPLOAD_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _upload_pool
+
+
+def _reset_upload_pool() -> None:
+    """Drop a broken upload pool so the next upload builds a new one."""
+    global _upload_pool
+    if _upload_pool is not None:
+        _upload_pool.shutdown(wait=False, cancel_futures=True)
+        _upload_pool = None
+
+
+async def warm_upload_pool():
+    """Start every upload pool worker in the background at server start."""
+    if UPLOAD_WORKERS == 1:
+        return
+    loop = asyncio.get_running_loop()
+    pool = _get_upload_pool()
     try:
-        supabase_client = create_client(supabase_url, supabase_key)
-    except Exception as e:
-        logging.exception(f"Error initializing Supabase: {e}")
-        print(f"Error initializing Supabase: {e}")
+        await asyncio.gather(
+            *(loop.run_in_executor(pool, warm_worker) for _ in range(UPLOAD_WORKERS))
+        )
+    except BrokenProcessPool:
+        logging.exception("Upload pool broken while warming, rebuilding it")
+        _reset_upload_pool()
+
+
+async def _parse_uploads(
+    jobs: list[tuple[str, bytes, str]], fecha: str
+) -> list[tuple[list[dict], list[str]]]:
+    """Parse (filename, data, store) jobs in the upload pool, in parallel.
+
+    A single workbook, or any batch when UPLOAD_WORKERS is 1, is parsed in a
+    thread instead, as there is nothing to run in parallel. If a worker died
+    and broke the pool, the pool is rebuilt and the batch is retried once.
+    """
+    if len(jobs) == 1 or UPLOAD_WORKERS == 1:
+        return await asyncio.to_thread(
+            lambda: [parse_workbook(*job, fecha) for job in jobs]
+        )
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        pool = _get_upload_pool()
+        try:
+            return await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        pool, parse_workbook, filename, data, store, fecha
+                    )
+                    for filename, data, store in jobs
+                )
+            )
+        except BrokenProcessPool:
+            logging.exception("Upload pool broken, rebuilding it")
+            _reset_upload_pool()
+            if attempt:
+                raise
 
 
 class InventoryItem(rx.Base):
@@ -27,6 +206,15 @@ class InventoryItem(rx.Base):
     familia: str = ""
     existencia: int = 0
     fecha: str = ""
+    tienda: str = ""
+
+
+class StoreSummary(rx.Base):
+    """Per-store totals for a date, read from inventarios_resumen."""
+
+    tienda: str = ""
+    total_items: int = 0
+    total_existencia: int = 0
 
 
 class InventoryState(rx.State):
@@ -37,6 +225,10 @@ class InventoryState(rx.State):
     selected_family: str = "Todas"
     selected_date: str = datetime.date.today().isoformat()
     families: list[str] = ["Todas"]
+    selected_store: str = "Todas"
+    stores: list[str] = ["Todas"]
+    store_summaries: list[StoreSummary] = []
+    upload_store: str = ""
     is_loading: bool = False
     is_uploading: bool = False
     error_message: str = ""
@@ -69,12 +261,16 @@ class InventoryState(rx.State):
 
     @rx.var
     def total_stock(self) -> int:
-        """Calculate total stock for filtered items."""
+        """Calculate total stock for filtered items, or for all stores."""
+        if self.selected_store == "Todas":
+            return sum((s.total_existencia for s in self.store_summaries))
         return sum((item.existencia for item in self.filtered_items))
 
     @rx.var
     def total_items(self) -> int:
-        """Calculate total count of filtered items."""
+        """Calculate total count of filtered items, or for all stores."""
+        if self.selected_store == "Todas":
+            return sum((s.total_items for s in self.store_summaries))
         return len(self.filtered_items)
 
     @rx.event
@@ -82,16 +278,48 @@ class InventoryState(rx.State):
         """Fetch inventory data from Supabase based on selected date."""
         self.is_loading = True
         self.error_message = ""
+        start = time.perf_counter()
+        supabase_client = await get_supabase_client_async()
         if not supabase_client:
             self.error_message = "Error: Credenciales de Supabase no configuradas."
             self.is_loading = False
             return
+        fecha = self.selected_date or datetime.date.today().isoformat()
         try:
-            query = supabase_client.table("inventarios").select("*")
-            if self.selected_date:
-                query = query.eq("fecha", self.selected_date)
-            response = query.execute()
-            data = response.data
+            summary_query = (
+                supabase_client.table("inventarios_resumen")
+                .select("*")
+                .eq("fecha", fecha)
+                .execute()
+            )
+            self.store_summaries = sorted(
+                [
+                    StoreSummary(
+                        tienda=row.get("tienda", ""),
+                        total_items=row.get("total_items", 0),
+                        total_existencia=row.get("total_existencia", 0),
+                    )
+                    for row in summary_query.data
+                ],
+                key=lambda s: s.tienda,
+            )
+            versions = {
+                row.get("tienda", ""): row.get("actualizado") or ""
+                for row in summary_query.data
+            }
+            self.stores = ["Todas"] + sorted(versions.keys())
+            if self.selected_store not in self.stores:
+                self.selected_store = "Todas"
+            if self.selected_store == "Todas" and len(versions) == 1:
+                self.selected_store = self.stores[1]
+            data = []
+            if self.selected_store != "Todas":
+                data = _fetch_partition(
+                    supabase_client,
+                    self.selected_store,
+                    fecha,
+                    versions[self.selected_store],
+                )
             self.items = [
                 InventoryItem(
                     id=item.get("id", 0),
@@ -100,6 +328,7 @@ class InventoryState(rx.State):
                     familia=item.get("familia", "Unknown"),
                     existencia=item.get("existencia", 0),
                     fecha=item.get("fecha", ""),
+                    tienda=item.get("tienda", ""),
                 )
                 for item in data
             ]
@@ -130,6 +359,7 @@ class InventoryState(rx.State):
             print(f"Supabase Fetch Error: {e}")
         finally:
             self.is_loading = False
+            _report_cold_start((time.perf_counter() - start) * 1000)
 
     @rx.event
     def set_date(self, date: str):
@@ -137,45 +367,61 @@ class InventoryState(rx.State):
         self.selected_date = date
         return InventoryState.load_data
 
+    @rx.event
+    def set_store(self, store: str):
+        """Update selected store and reload data."""
+        self.selected_store = store
+        return InventoryState.load_data
+
     @rx.event
     async def handle_upload(self, files: list[rx.UploadFile]):
-        """Handle Excel file upload."""
+        """Handle Excel file uploads, one or more workbooks with any sheets."""
         self.is_uploading = True
         self.error_message = ""
         self.success_message = ""
         if not files:
             self.is_uploading = False
             return
-        file = files[0]
-        upload_data = await file.read()
+        default_store = self.upload_store.strip()
+        today = datetime.date.today().isoformat()
         try:
-            df = pd.read_excel(io.BytesIO(upload_data))
-            required_cols = ["sku", "descripcion", "familia", "existencia"]
-            df.columns = [c.lower() for c in df.columns]
-            missing = [col for col in required_cols if col not in df.columns]
-            if missing:
-                raise ValueError(f"Columnas faltantes en Excel: {', '.join(missing)}")
-            records = df[required_cols].to_dict("records")
-            today = datetime.date.today().isoformat()
+            uploads = await asyncio.gather(*(file.read() for file in files))
+            jobs = []
+            for i, (file, data) in enumerate(zip(files, uploads)):
+                filename = file.name or f"archivo {i + 1}"
+                store = default_store
+                if not store and len(files) > 1:
+                    store = os.path.splitext(os.path.basename(filename))[0].strip()
+                jobs.append((filename, data, store))
+            results = await _parse_uploads(jobs, today)
             final_records = []
-            for r in records:
-                final_records.append(
-                    {
-                        "sku": str(r["sku"]),
-                        "descripcion": str(r["descripcion"]),
-                        "familia": str(r["familia"]),
-                        "existencia": int(r["existencia"]),
-                        "fecha": today,
-                    }
-                )
+            errors = []
+            for records, file_errors in results:
+                final_records.extend(records)
+                errors.extend(file_errors)
+            seen = set()
+            for r in final_records:
+                key = (r["tienda"], r["sku"])
+                if key in seen:
+                    errors.append(
+                        f"SKU {r['sku']} repetido para la tienda {r['tienda']}"
+                    )
+                seen.add(key)
+            if errors:
+                shown = "; ".join(errors[:5])
+                if len(errors) > 5:
+                    shown += f"; y {len(errors) - 5} errores más"
+                raise ValueError(shown)
+            if not final_records:
+                raise ValueError("Los archivos no contienen productos.")
+            supabase_client = await get_supabase_client_async()
             if not supabase_client:
                 raise Exception("Supabase client not initialized")
-            supabase_client.table("inventarios").delete().eq("fecha", today).execute()
-            batch_size = 1000
-            for i in range(0, len(final_records), batch_size):
-                batch = final_records[i : i + batch_size]
-                supabase_client.table("inventarios").insert(batch).execute()
-            self.success_message = f"Se cargaron {len(final_records)} productos exitosamente para la fecha {today}."
+            stores = sorted({r["tienda"] for r in final_records})
+            await asyncio.to_thread(
+                _replace_partitions, supabase_client, today, final_records
+            )
+            self.success_message = f"Se cargaron {len(final_records)} productos exitosamente para {len(stores)} tienda(s) ({', '.join(stores)}) en la fecha {today}."
             yield InventoryState.load_data
         except Exception as e:
             logging.exception(f"Upload Error: {e}")
@@ -189,6 +435,7 @@ class InventoryState(rx.State):
         if not self.new_family_name:
             self.error_message = "El nombre de la familia es requerido."
             return
+        supabase_client = await get_supabase_client_async()
         if not supabase_client:
             self.error_message = "Error de conexión."
             return
@@ -211,4 +458,4 @@ class InventoryState(rx.State):
             yield InventoryState.load_data
         except Exception as e:
             logging.exception(f"Create Family Error: {e}")
-            self.error_message = f"Error al crear familia: {str(e)}"
\ No newline at end of file
+            self.error_message = f"Error al crear familia: {str(e)}"
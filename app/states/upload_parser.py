@@ -0,0 +1,71 @@
+import io
+
+REQUIRED_COLUMNS = ["sku", "descripcion", "familia", "existencia"]
+
+
+def warm_worker() -> None:
+    """Load the Excel parsing libraries in an upload pool worker."""
+    import openpyxl
+    import pandas
+
+
+def parse_workbook(
+    filename: str, data: bytes, default_store: str, fecha: str
+) -> tuple[list[dict], list[str]]:
+    """Parse every sheet of an uploaded workbook into inventory records.
+
+    Runs in an upload pool worker, or in a thread for single-file uploads.
+    Returns the records and the validation errors, each
+    prefixed with the file and sheet it comes from. Rows take their store from
+    a `tienda` column when the sheet has one, else `default_store`.
+    """
+    import pandas as pd
+
+    try:
+        sheets = pd.read_excel(io.BytesIO(data), sheet_name=None)
+    except Exception as e:
+        return [], [f"{filename}: {e}"]
+    records = []
+    errors = []
+    for sheet_name, df in sheets.items():
+        origin = f"{filename} / {sheet_name}"
+        if df.empty:
+            continue
+        df.columns = [str(c).strip().lower() for c in df.columns]
+        missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+        if missing:
+            errors.append(f"{origin}: columnas faltantes: {', '.join(missing)}")
+            continue
+        has_store = "tienda" in df.columns
+        if not has_store and not default_store:
+            errors.append(
+                f"{origin}: falta la tienda (columna 'tienda' o campo Tienda)"
+            )
+            continue
+        columns = REQUIRED_COLUMNS + (["tienda"] if has_store else [])
+        rows_without_store = 0
+        for r in df[columns].to_dict("records"):
+            tienda = default_store
+            if has_store and pd.notna(r["tienda"]) and str(r["tienda"]).strip():
+                tienda = str(r["tienda"]).strip()
+            if not tienda:
+                rows_without_store += 1
+                continue
+            try:
+                existencia = int(r["existencia"])
+            except (TypeError, ValueError):
+                errors.append(f"{origin}: existencia inválida para SKU {r['sku']}")
+                continue
+            records.append(
+                {
+                    "sku": str(r["sku"]),
+                    "descripcion": str(r["descripcion"]),
+                    "familia": str(r["familia"]),
+                    "existencia": existencia,
+                    "fecha": fecha,
+                    "tienda": tienda,
+                }
+            )
+        if rows_without_store:
+            errors.append(f"{origin}: {rows_without_store} filas sin tienda")
+    return records, errors